@@ -0,0 +1,37 @@
+-- Muestra con comentarios y cadenas entre comillas (el reporte debe incluir todas las tablas)
+
+-- Tabla de clientes (SIN ERROR: los apóstrofos en comentarios y cadenas no cortan la tabla)
+CREATE TABLE clientes (
+    id_cliente INT NOT NULL, /* it's a block comment, (with parens) */
+    nombre VARCHAR(100) NOT NULL COMMENT "user's note",
+    estado VARCHAR(20) DEFAULT 'it''s active, (default)',
+    PRIMARY KEY (id_cliente)
+);
+
+/* Tabla de facturas: comentario de bloque
+   con "comillas" y un apóstrofo: don't */
+CREATE TABLE facturas (
+    id_factura INT NOT NULL, -- don't split here (
+    id_cliente INT NOT NULL,
+    total DECIMAL(10, 2) NOT NULL CHECK (total >= 0),
+    PRIMARY KEY (id_factura),
+    CONSTRAINT fk_facturas_clientes FOREIGN KEY (id_cliente) REFERENCES clientes (id_cliente)
+);
+
+-- Tabla de auditoría (SIN ERROR: columnas cuyo nombre empieza con CONSTRAINT/PRIMARY/FOREIGN siguen siendo columnas)
+CREATE TABLE auditoria (
+    id_auditoria INT NOT NULL,
+    CONSTRAINT_NAME VARCHAR(50),
+    CONSTRAINTS INT,
+    PRIMARY_KEY_FLAG INT,
+    FOREIGN_KEYS INT,
+    CONSTRAINT pk_auditoria PRIMARY KEY (id_auditoria)
+);
+
+-- Tabla de notas (SIN ERROR: comillas escapadas con barra invertida al estilo MySQL)
+CREATE TABLE notas (
+    id_nota INT NOT NULL,
+    texto VARCHAR(255) COMMENT 'it\'s a note, (with parens)',
+    ruta VARCHAR(255) DEFAULT 'C:\\',
+    PRIMARY KEY (id_nota)
+);
@@ -1,110 +1,30 @@
 import re
 import argparse
 import os
-from collections import defaultdict
+import mmap
+import stat
+import sys
 
-def parse_ddl_file(filepath):
-    if not os.path.exists(filepath):
-        raise FileNotFoundError(f"El archivo {filepath} no existe.")
-
-    with open(filepath, 'r') as file:
-        ddl_content = file.read()
-    return ddl_content
-
-def extract_table_definitions(ddl_content):
-    table_pattern = re.compile(r'CREATE TABLE\s+(\w+)\s*\((.*?)\);', re.S)
-    column_pattern = re.compile(r'(\w+)\s+([\w\(\)]+)\s*(.*?)(?:,|$)', re.S)
-    primary_key_pattern = re.compile(r'PRIMARY KEY\s*\((.*?)\)')
-    foreign_key_pattern = re.compile(r'FOREIGN KEY\s*\((.*?)\)\s*REFERENCES\s+(\w+)\s*\((.*?)\)')
-
-    tables = {}
+TABLE_HEADER_RE = re.compile(rb'CREATE TABLE\s+([\w\x80-\xff]+)\s*\(')
+BODY_DELIMITER_RE = re.compile(rb"[()'\"]|--|/\*")
+LINE_COMMENT_RE = re.compile(rb'--[^\n]*')
+BLOCK_COMMENT_RE = re.compile(rb'/\*.*?\*/', re.S)
+NON_PAREN_BYTES = bytes(b for b in range(256) if b not in b'()')
+QUOTED_BODY_DELIMITER_RE = re.compile(r"[(),'\"]")
+LPAREN, RPAREN, QUOTE, DOUBLE_QUOTE, DASH, BACKSLASH = b"()'\"-\\"
+DECODE_ERRORS = 'replace'
+DATA_TYPE_RE = re.compile(r'\s*\S+\s+((?:[^\s(]|\([^)]*\))*)\s*(.*)', re.S)
 
-    for table_match in table_pattern.finditer(ddl_content):
-        table_name = table_match.group(1)
-        columns_section = table_match.group(2)
-
-        columns = []
-        primary_key = None
-        foreign_keys = []
-
-        for column_match in column_pattern.finditer(columns_section):
-            column_name = column_match.group(1)
-            data_type = column_match.group(2)
-            constraints = column_match.group(3)
-
-            if "PRIMARY KEY" in constraints:
-                primary_key = column_name
-            if "FOREIGN KEY" in constraints:
-                continue
+TABLE_CONSTRAINT_WORDS = ('CONSTRAINT', 'PRIMARY', 'FOREIGN')
+KEY_CONSTRAINT_WORDS = ('PRIMARY', 'FOREIGN')
+KEY_WORD_RE = re.compile(r'KEY\b')
+FK_HINT_RE = re.compile(r'id|fk|ref', re.I)
 
-            columns.append({
-                'name': column_name,
-                'data_type': data_type,
-                'constraints': constraints
-            })
-
-        primary_key_match = primary_key_pattern.search(columns_section)
-        if primary_key_match:
-            primary_key = primary_key_match.group(1).strip()
-
-        for foreign_key_match in foreign_key_pattern.finditer(columns_section):
-            fk_column = foreign_key_match.group(1).strip()
-            referenced_table = foreign_key_match.group(2).strip()
-            referenced_column = foreign_key_match.group(3).strip()
-            foreign_keys.append((fk_column, referenced_table, referenced_column))
-
-        tables[table_name] = {
-            'columns': columns,
-            'primary_key': primary_key,
-            'foreign_keys': foreign_keys
-        }
-
-    return tables
-
-def analyze_tables(tables):
-    report = []
-
-    for table_name, table_info in tables.items():
-        primary_key = table_info['primary_key']
-        foreign_keys = table_info['foreign_keys']
-
-        if not primary_key:
-            report.append((f"Table '{table_name}' does not have a primary key defined.", "error"))
+SEVERITIES = ('error', 'warning', 'info')
+SEV_UPPER = {severity: f" ({severity.upper()})\n" for severity in SEVERITIES}
+HTML_ENTRY_PREFIX = {severity: f"<div class='message {severity}'><strong>{severity.capitalize()}:</strong> " for severity in SEVERITIES}
 
-        if not foreign_keys:
-            possible_fks = [col['name'] for col in table_info['columns'] if 'id' in col['name'].lower() or 'fk' in col['name'].lower() or 'ref' in col['name'].lower()]
-            if not possible_fks:
-                report.append((f"Table '{table_name}' has no foreign key relationships detected, explicit or implicit.", "warning"))
-            else:
-                report.append((f"Table '{table_name}' has possible foreign key columns: {', '.join(possible_fks)} but no explicit foreign key constraint is defined.", "warning"))
-        else:
-            for fk_column, ref_table, ref_column in foreign_keys:
-                if ref_table not in tables:
-                    report.append((f"Foreign key column '{fk_column}' in table '{table_name}' references non-existent table '{ref_table}'.", "error"))
-                elif ref_column not in [col['name'] for col in tables[ref_table]['columns']]:
-                    report.append((f"Foreign key column '{fk_column}' in table '{table_name}' references non-existent column '{ref_column}' in table '{ref_table}'.", "error"))
-
-        for col in table_info['columns']:
-            if col['name'] == primary_key or any(fk_col[0] == col['name'] for fk_col in foreign_keys):
-                if 'INDEX' not in col['constraints'].upper():
-                    report.append((f"Key column '{col['name']}' in table '{table_name}' is not indexed.", "warning"))
-
-        if len(foreign_keys) > 1:
-            fk_columns = [fk[0] for fk in foreign_keys]
-            if primary_key not in fk_columns and primary_key:
-                report.append((f"Table '{table_name}' may have a cardinality issue: it has multiple foreign keys but the primary key is not a composite of these foreign keys. This could be a many-to-many relationship incorrectly modeled as one-to-many.", "warning"))
-
-        if foreign_keys:
-            if len(foreign_keys) == 1:
-                report.append((f"Table '{table_name}' seems to have a one-to-many relationship with table '{foreign_keys[0][1]}'.", "info"))
-            elif len(foreign_keys) > 1:
-                report.append((f"Table '{table_name}' may have a many-to-many relationship or an incorrect FK setup.", "warning"))
-
-    return report
-
-def generate_report(report, output_format='text'):
-    if output_format == 'html':
-        html_report = """
+HTML_TEMPLATE = """
         <html>
             <head>
                 <title>DDL Analysis Report</title>
@@ -152,41 +72,327 @@ def generate_report(report, output_format='text'):
                 <div class="container">
                     <h1>DDL Analysis Report</h1>
                     <div>
-        """
-
-        for entry, severity in report:
-            css_class = severity
-            html_report += f"<div class='message {css_class}'><strong>{severity.capitalize()}:</strong> {entry}</div>"
-
-        html_report += """
+        {entries}
                     </div>
                 </div>
             </body>
         </html>
         """
-        return html_report
+HEADER_HTML, FOOTER_HTML = HTML_TEMPLATE.split('{entries}')
+
+def parse_ddl_file(filepath):
+    if not os.path.exists(filepath):
+        raise FileNotFoundError(f"El archivo {filepath} no existe.")
+
+    with open(filepath, 'rb') as file:
+        file_stat = os.fstat(file.fileno())
+        if stat.S_ISREG(file_stat.st_mode) and file_stat.st_size > 0:
+            ddl_content = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            ddl_content = file.read()
+    return ddl_content
+
+def is_balanced(body):
+    parens = body.translate(None, NON_PAREN_BYTES)
+    if parens == b'()' * (len(parens) // 2):
+        return True
+    while b'()' in parens:
+        parens = parens.replace(b'()', b'')
+    return not parens
+
+def split_top_level(body):
+    pieces = []
+    pending = None
+    for part in body.split(','):
+        if pending is not None:
+            part = pending + ',' + part
+        elif '(' not in part:
+            pieces.append(part)
+            continue
+        if part.count('(') == part.count(')'):
+            pieces.append(part)
+            pending = None
+        else:
+            pending = part
+    return pieces
+
+def find_closing_quote(text, quote, start, limit, backslash):
+    i = text.find(quote, start, limit)
+    while i != -1:
+        j = i - 1
+        while text[j] == backslash:
+            j -= 1
+        if (i - j) % 2 == 1:
+            return i
+        i = text.find(quote, i + 1, limit)
+    return -1
+
+def split_quoted_body(body):
+    pieces = []
+    depth = 0
+    piece_start = 0
+    search = QUOTED_BODY_DELIMITER_RE.search
+    match = search(body)
+
+    while match:
+        i = match.start()
+        ch = body[i]
+        if ch == '(':
+            depth += 1
+        elif ch == ')':
+            depth -= 1
+        elif ch == ',':
+            if depth == 0:
+                pieces.append(body[piece_start:i])
+                piece_start = i + 1
+        else:
+            i = find_closing_quote(body, ch, i + 1, len(body), '\\')
+            if i == -1:
+                break
+        match = search(body, i + 1)
+
+    pieces.append(body[piece_start:])
+    return pieces
+
+def split_definitions(data, start, limit, encoding):
+    region = data[start:limit]
+    if b"'" not in region and b'"' not in region:
+        if b'/*' in region:
+            if b'--' in region:
+                return split_scanned_body(data, start, limit, encoding)
+            region = BLOCK_COMMENT_RE.sub(b' ', region)
+        elif b'--' in region:
+            region = LINE_COMMENT_RE.sub(b'', region)
+        end = region.find(b');')
+        if end != -1:
+            body = region[:end]
+            if b'/*' not in body and is_balanced(body):
+                return split_top_level(body.decode(encoding, DECODE_ERRORS))
+
+    return split_scanned_body(data, start, limit, encoding)
+
+def split_scanned_body(data, start, limit, encoding):
+    fragments = []
+    depth = 0
+    piece_start = start
+    quoted = False
+    search = BODY_DELIMITER_RE.search
+    match = search(data, start, limit)
+
+    while match:
+        i = match.start()
+        ch = data[i]
+        if ch == LPAREN:
+            depth += 1
+        elif ch == RPAREN:
+            if depth == 0:
+                fragments.append(data[piece_start:i])
+                body = b''.join(fragments).decode(encoding, DECODE_ERRORS)
+                return split_quoted_body(body) if quoted else split_top_level(body)
+            depth -= 1
+        elif ch == QUOTE or ch == DOUBLE_QUOTE:
+            quoted = True
+            i = find_closing_quote(data, b"'" if ch == QUOTE else b'"', i + 1, limit, BACKSLASH)
+            if i == -1:
+                break
+        elif ch == DASH:
+            fragments.append(data[piece_start:i])
+            i = data.find(b'\n', i, limit)
+            if i == -1:
+                break
+            piece_start = i
+        else:
+            fragments.append(data[piece_start:i])
+            fragments.append(b' ')
+            i = data.find(b'*/', i + 2, limit)
+            if i == -1:
+                break
+            i += 1
+            piece_start = i + 1
+        match = search(data, i + 1, limit)
+
+    return None
+
+def classify_definition(definition):
+    parts = definition.split(None, 1)
+    keyword = None
+    if parts[0] == 'CONSTRAINT':
+        keyword = 'CONSTRAINT'
+        named = parts[1].split(None, 1) if len(parts) == 2 else []
+        definition = named[1] if len(named) == 2 else ''
+        parts = definition.split(None, 1) or ['']
+
+    if parts[0] in KEY_CONSTRAINT_WORDS and len(parts) == 2 and KEY_WORD_RE.match(parts[1]):
+        keyword = parts[0]
+    return keyword, definition
+
+def parse_foreign_key(definition):
+    column_open = definition.find('(')
+    column_close = definition.find(')', column_open)
+    references = definition.find('REFERENCES', column_close)
+    if column_open == -1 or column_close == -1 or references == -1:
+        return None
+
+    ref_open = definition.find('(', references)
+    ref_close = definition.find(')', ref_open)
+    if ref_open == -1 or ref_close == -1:
+        return None
+
+    fk_column = definition[column_open + 1:column_close].strip()
+    referenced_table = sys.intern(definition[references + len('REFERENCES'):ref_open].strip())
+    referenced_column = definition[ref_open + 1:ref_close].strip()
+    return (fk_column, referenced_table, referenced_column)
+
+def extract_table_definitions(ddl_content, encoding='utf-8'):
+    tables = {}
+
+    header = TABLE_HEADER_RE.search(ddl_content)
+    while header:
+        next_header = TABLE_HEADER_RE.search(ddl_content, header.end())
+        limit = next_header.start() if next_header else len(ddl_content)
+        table_name = header.group(1).decode(encoding, DECODE_ERRORS)
+        pieces = split_definitions(ddl_content, header.end(), limit, encoding)
+        header = next_header
+        if pieces is None:
+            tables[sys.intern(table_name)] = {
+                'parsed': False,
+                'names': [],
+                'dtypes': [],
+                'indexed': [],
+                'primary_key': None,
+                'foreign_keys': [],
+                'col_set': frozenset(),
+                'fk_cols': frozenset()
+            }
+            continue
+
+        names = []
+        dtypes = []
+        indexed = []
+        primary_key = None
+        table_primary_key = None
+        foreign_keys = []
+
+        for piece in pieces:
+            parts = piece.split(None, 2)
+            if len(parts) < 2:
+                continue
+            column_name = parts[0]
+
+            if column_name in TABLE_CONSTRAINT_WORDS:
+                keyword, definition = classify_definition(piece.strip())
+                if keyword == 'PRIMARY':
+                    key_open = definition.find('(')
+                    key_close = definition.find(')', key_open)
+                    if key_open != -1 and key_close != -1:
+                        table_primary_key = definition[key_open + 1:key_close].strip()
+                elif keyword == 'FOREIGN':
+                    foreign_key = parse_foreign_key(definition)
+                    if foreign_key:
+                        foreign_keys.append(foreign_key)
+                if keyword:
+                    continue
+
+            data_type = parts[1]
+            constraints = parts[2] if len(parts) == 3 else ''
+            if '(' in data_type and data_type.count('(') != data_type.count(')'):
+                data_type, constraints = DATA_TYPE_RE.match(piece).groups()
+
+            if "PRIMARY KEY" in constraints:
+                primary_key = column_name
+
+            names.append(column_name)
+            dtypes.append(data_type)
+            indexed.append('INDEX' in constraints.upper())
+
+        if table_primary_key:
+            primary_key = table_primary_key
+
+        tables[sys.intern(table_name)] = {
+            'parsed': True,
+            'names': names,
+            'dtypes': dtypes,
+            'indexed': indexed,
+            'primary_key': primary_key,
+            'foreign_keys': foreign_keys,
+            'col_set': frozenset(names),
+            'fk_cols': frozenset(fk[0] for fk in foreign_keys)
+        }
+
+    return tables
+
+def analyze_tables(tables):
+    for table_name, table_info in tables.items():
+        if not table_info['parsed']:
+            yield (f"Table '{table_name}' could not be parsed (unterminated quote, comment or parenthesis) and was skipped.", "error")
+            continue
+
+        primary_key = table_info['primary_key']
+        foreign_keys = table_info['foreign_keys']
+
+        if not primary_key:
+            yield (f"Table '{table_name}' does not have a primary key defined.", "error")
+
+        if not foreign_keys:
+            possible_fks = [name for name in table_info['names'] if FK_HINT_RE.search(name)]
+            if not possible_fks:
+                yield (f"Table '{table_name}' has no foreign key relationships detected, explicit or implicit.", "warning")
+            else:
+                yield (f"Table '{table_name}' has possible foreign key columns: {', '.join(possible_fks)} but no explicit foreign key constraint is defined.", "warning")
+        else:
+            for fk_column, ref_table, ref_column in foreign_keys:
+                if ref_table not in tables:
+                    yield (f"Foreign key column '{fk_column}' in table '{table_name}' references non-existent table '{ref_table}'.", "error")
+                elif tables[ref_table]['parsed'] and ref_column not in tables[ref_table]['col_set']:
+                    yield (f"Foreign key column '{fk_column}' in table '{table_name}' references non-existent column '{ref_column}' in table '{ref_table}'.", "error")
+
+        for column_name, has_index in zip(table_info['names'], table_info['indexed']):
+            if column_name == primary_key or column_name in table_info['fk_cols']:
+                if not has_index:
+                    yield (f"Key column '{column_name}' in table '{table_name}' is not indexed.", "warning")
+
+        if len(foreign_keys) > 1:
+            if primary_key and primary_key not in table_info['fk_cols']:
+                yield (f"Table '{table_name}' may have a cardinality issue: it has multiple foreign keys but the primary key is not a composite of these foreign keys. This could be a many-to-many relationship incorrectly modeled as one-to-many.", "warning")
+
+        if foreign_keys:
+            if len(foreign_keys) == 1:
+                yield (f"Table '{table_name}' seems to have a one-to-many relationship with table '{foreign_keys[0][1]}'.", "info")
+            elif len(foreign_keys) > 1:
+                yield (f"Table '{table_name}' may have a many-to-many relationship or an incorrect FK setup.", "warning")
+
+def write_report(report_iter, out, output_format='text'):
+    if output_format == 'html':
+        out.write(HEADER_HTML)
+        for entry, severity in report_iter:
+            out.write(HTML_ENTRY_PREFIX[severity] + entry + '</div>')
+        out.write(FOOTER_HTML)
     else:
-        return "\n".join(f"{entry} ({severity.upper()})" for entry, severity in report)
+        for entry, severity in report_iter:
+            out.write(entry + SEV_UPPER[severity])
 
 def main():
     parser = argparse.ArgumentParser(description='Analyze DDL file for table structure and constraints.')
     parser.add_argument('filepath', help='The full path to the DDL file including the filename')
     parser.add_argument('--output', choices=['text', 'html'], default='text', help='Output format for the report (default: text)')
+    parser.add_argument('--encoding', default='utf-8', help='Text encoding of the DDL file, e.g. cp1252 or latin-1 (default: utf-8)')
 
     args = parser.parse_args()
 
     ddl_content = parse_ddl_file(args.filepath)
-    tables = extract_table_definitions(ddl_content)
+    try:
+        tables = extract_table_definitions(ddl_content, args.encoding)
+    finally:
+        if isinstance(ddl_content, mmap.mmap):
+            ddl_content.close()
     report = analyze_tables(tables)
 
-    report_output = generate_report(report, args.output)
-
     if args.output == 'html':
         with open('ddl_analysis_report.html', 'w') as file:
-            file.write(report_output)
+            write_report(report, file, args.output)
         print("Report generated: ddl_analysis_report.html")
     else:
-        print(report_output)
+        write_report(report, sys.stdout, args.output)
 
 if __name__ == '__main__':
     main()